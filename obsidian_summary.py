@@ -1,53 +1,130 @@
+import io
 import os
-import glob
 import re
-import yaml
-import smtplib
+import json
 import logging
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from logging.handlers import TimedRotatingFileHandler
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 from datetime import datetime, timedelta
-import requests
+
+import yaml
+
+# libyamlが利用可能な場合はC実装の高速なローダーを使用する
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+# 実行環境がWindowsかどうか
+_IS_WIN = os.name == 'nt'
+
+# 繰り返し使用する正規表現は事前にコンパイルしておく
+_TEMPLATE_RE = re.compile(r'\{\{[^}]+\}\}')
+_TAG_RE = re.compile(r'#\w+')
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+# ノートをタグ検索する際の読み込み単位（バイト）
+_READ_CHUNK_SIZE = 8192
+# ノート読み込み時のバッファサイズ（バイト）
+_READ_BUFFER_SIZE = 1 << 17
+
+# ストリーミング受信中に進捗をログ出力する間隔（受信チャンク数）
+_STREAM_LOG_INTERVAL = 50
+
+# ノート解析結果キャッシュのファイル名（ログディレクトリに保存）と保持する最大件数
+_PARSE_CACHE_FILENAME = '.parse_cache.pkl'
+_PARSE_CACHE_MAX_ENTRIES = 10000
+# 解析結果の形式を変更した場合に古いキャッシュを破棄するための版数
+_PARSE_CACHE_VERSION = 2
+
+# 設定ファイルの解析結果のキャッシュ（絶対パス -> (更新日時, 設定)）
+_config_cache = {}
+
+
+def _load_config_file(config_path):
+    """設定ファイルを読み込む（前回から更新されていなければ解析結果を再利用）"""
+    key = os.path.abspath(config_path)
+    mtime = os.stat(config_path).st_mtime_ns
+    cached = _config_cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.load(f, Loader=_SafeLoader)
+    _config_cache[key] = (mtime, config)
+    return config
 
 
 def setup_logging(config):
     """ロギングの設定とログローテーションの実装"""
     log_dir = config.get('logging', {}).get('directory', 'logs')
     os.makedirs(log_dir, exist_ok=True)
+    log_file = os.path.join(log_dir, 'obsidian_summary.log')
 
-    # 日付付きのログファイル名を生成
-    current_date = datetime.now().strftime('%Y-%m-%d')
-    log_file = os.path.join(log_dir, f'obsidian_summary_{current_date}.log')
+    # 日付が変わるとログファイルをローテーションし、保持日数を超えた古いログは自動で削除する
+    # （backupCount=0 は無制限に保持する指定になるため、最低1日分とする）
+    retention_days = config.get('logging', {}).get('retention_days', 7)
+    file_handler = TimedRotatingFileHandler(log_file,
+                                            when='midnight',
+                                            backupCount=max(retention_days, 1),
+                                            encoding='utf-8')
 
     # ロギングの設定
     logging.basicConfig(level=logging.INFO,
                         format='%(asctime)s - %(levelname)s - %(message)s',
                         handlers=[
-                            logging.FileHandler(log_file, encoding='utf-8'),
+                            file_handler,
                             logging.StreamHandler()
                         ])
 
-    # 古いログファイルの削除
-    retention_days = config.get('logging', {}).get('retention_days', 7)
-    cleanup_old_logs(log_dir, retention_days)
-
 
-def cleanup_old_logs(log_dir, retention_days):
-    """指定日数より古いログファイルを削除"""
-    current_date = datetime.now()
-    for filename in os.listdir(log_dir):
-        if not filename.endswith('.log'):
-            continue
-
-        file_path = os.path.join(log_dir, filename)
-        file_date = datetime.fromtimestamp(os.path.getctime(file_path))
-
-        if (current_date - file_date).days > retention_days:
-            try:
-                os.remove(file_path)
-                logging.info(f"古いログファイルを削除しました: {filename}")
-            except Exception as e:
-                logging.error(f"ログファイルの削除に失敗: {filename} - {e}")
+def _split_frontmatter(content):
+    """先頭の '---' で囲まれたフロントマターと本文に分割（フロントマターが無い場合は (None, content)）"""
+    if not content.startswith('---'):
+        return None, content
+    # 1回の分割で区切りの前後を取り出す（先頭の区切りの前は空文字列になる）
+    parts = content.split('---', 2)
+    if len(parts) < 3:
+        return None, content
+    return parts[1], parts[2]
+
+
+def _scan_list_line(line):
+    """行頭インデントの長さと、その行がリストアイテム（"- "）を開始するかを返す"""
+    stripped = line.lstrip()
+    indent_len = len(line) - len(stripped)
+    is_list_item = stripped[:1] == '-' and stripped[1:2].isspace()
+    return indent_len, is_list_item
+
+
+def _iter_md_files(root):
+    """指定ディレクトリ配下のMarkdownファイルを列挙し、os.DirEntryを返す"""
+    # 再帰呼び出しの代わりに明示的なスタックで走査する（深い階層でも開いたままのディレクトリが増えない）
+    stack = [root]
+    # globと同様にシンボリックリンクのディレクトリも辿るため、循環しないよう走査済みのディレクトリを記録する
+    visited = set()
+    while stack:
+        directory = stack.pop()
+        try:
+            st = os.stat(directory)
+            dir_id = (st.st_dev, st.st_ino)
+            if dir_id in visited:
+                continue
+            visited.add(dir_id)
+            with os.scandir(directory) as it:
+                for entry in it:
+                    # globと同様に隠しファイル・隠しディレクトリ（.obsidian等）は対象外
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir():
+                        stack.append(entry.path)
+                    elif entry.is_file() and entry.name.endswith('.md'):
+                        yield entry
+        except OSError as e:
+            logging.warning(f"ディレクトリの読み込みに失敗: {directory} - {e}")
 
 
 class ObsidianSummary:
@@ -57,20 +134,83 @@ class ObsidianSummary:
         self.logger = logging.getLogger(__name__)
         self.load_config(config_path)
         self.validate_vault_path()
+        # OpenAI API用のHTTPセッション（要約を行う場合のみ初回使用時に作成）
+        self._http = None
+        # 検索対象期間（run()ごとに一度だけ計算する）
+        self._search_period = None
+        # ノート解析結果のキャッシュ（パス -> ((更新日時ns, サイズ), 解析結果)、最近使用した順）
+        log_dir = self.config.get('logging', {}).get('directory', 'logs')
+        self._parse_cache_path = os.path.join(log_dir, _PARSE_CACHE_FILENAME)
+        self._parse_cache_lock = threading.Lock()
+        self._parse_cache = self._load_parse_cache()
+
+    def _load_parse_cache(self):
+        """前回実行時のノート解析結果キャッシュを読み込む（形式や対象タグが変わっている場合は破棄）"""
+        try:
+            with open(self._parse_cache_path, 'rb') as f:
+                cached = pickle.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.warning(f"解析結果キャッシュの読み込みに失敗したため破棄します: {e}")
+            return {}
+
+        if (not isinstance(cached, tuple) or len(cached) != 3
+                or cached[:2] != (_PARSE_CACHE_VERSION, self._target_tag)):
+            return {}
+        return cached[2]
+
+    def _save_parse_cache(self):
+        """ノート解析結果キャッシュを保存（最近使用したものから上限件数まで）"""
+        with self._parse_cache_lock:
+            entries = self._parse_cache
+            if len(entries) > _PARSE_CACHE_MAX_ENTRIES:
+                entries = dict(list(entries.items())[-_PARSE_CACHE_MAX_ENTRIES:])
+                self._parse_cache = entries
+
+        # 書き込み途中で中断されても壊れたキャッシュが残らないよう、一時ファイル経由で置き換える
+        tmp_path = self._parse_cache_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((_PARSE_CACHE_VERSION, self._target_tag, entries), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._parse_cache_path)
+        except Exception as e:
+            self.logger.warning(f"解析結果キャッシュの保存に失敗: {e}")
+
+    def _create_http_session(self):
+        """OpenAI API呼び出し用のHTTPセッションを作成（接続を再利用し、一時的なエラーはリトライ）"""
+        # requests は読み込みが重いため、要約対象がなく使わない実行では読み込まない
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        session.headers.update({"Content-Type": "application/json"})
+        # 応答の読み込み中のエラー・タイムアウトはサーバー側で処理済みの可能性があり、
+        # 再送すると要約が重複して生成・課金されるため、接続エラーと指定したステータスのみ再試行する
+        retry = Retry(total=3,
+                      read=0,
+                      backoff_factor=1.0,
+                      status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=frozenset(['POST']))
+        session.mount('https://', HTTPAdapter(pool_connections=1,
+                                              pool_maxsize=4,
+                                              max_retries=retry))
+        return session
 
     def _convert_to_unc_path(self, path):
         """Windowsの場合のみUNCパスに変換"""
-        if os.name == 'nt' and not path.startswith('\\\\'):
+        if _IS_WIN and not path.startswith('\\\\'):
             return '\\\\?\\' + path
         return path
 
     def validate_vault_path(self):
         """vaultの場所を確認し、存在しない場合は例外を発生させる"""
-        vault_path = self.config['vault_path']
-        self.logger.info(f"Vault location: {vault_path}")
+        self.logger.info(f"Vault location: {self.config['vault_path']}")
 
-        # OSに応じてパスを変換
-        vault_path = self._convert_to_unc_path(vault_path)
+        # OSに応じて変換済みのパスで確認
+        vault_path = self._vault_path
 
         if not os.path.exists(vault_path):
             error_msg = f"Vault path does not exist: {vault_path}"
@@ -80,14 +220,28 @@ class ObsidianSummary:
     def load_config(self, config_path):
         """設定ファイルの読み込み"""
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                self.config = yaml.safe_load(f)
+            self.config = _load_config_file(config_path)
         except Exception as e:
             self.logger.error(f"設定ファイルの読み込みに失敗: {e}")
             raise
 
+        # vaultのパスはOSに応じて一度だけ変換しておく
+        self._vault_path = self._convert_to_unc_path(self.config['vault_path'])
+        # 対象タグとその派生値はファイルごとに参照するため、読み込み時に一度だけ計算する
+        self._target_tag = self.config['target_tag']
+        self._target_tag_bytes = self._target_tag.encode('utf-8')
+        # 正規表現より先に部分文字列検索で高速に絞り込むための文字列
+        self._tag_needle = '#' + self._target_tag
+        self._tag_needle_bytes = self._tag_needle.encode('utf-8')
+        # タグが単独の単語として存在するか確認するための正規表現
+        self._search_tag_regex = re.compile(
+            rf'#{re.escape(self._target_tag)}(?:$|\s|[^\w#])')
+
     def _get_search_period(self):
-        """検索対象期間の開始時刻と終了時刻を計算"""
+        """検索対象期間の開始時刻と終了時刻を計算（計算済みの場合はその結果を返す）"""
+        if self._search_period is not None:
+            return self._search_period
+
         now = datetime.now()
         search_period = self.config.get('search_period', {})
 
@@ -113,130 +267,237 @@ class ObsidianSummary:
         start_datetime = datetime.combine(
             now.date() - timedelta(days=days - 1), start_time)
 
-        return start_datetime, end_datetime
+        self._search_period = (start_datetime, end_datetime)
+        return self._search_period
 
     def _process_frontmatter(self, content, filepath):
         """フロントマターを処理し、テンプレート構文を処理可能な形に変換"""
-        if not content.startswith('---'):
+        frontmatter_str, body = _split_frontmatter(content)
+        if frontmatter_str is None:
             return {}, content
 
-        frontmatter_end = content.find('---', 3)
-        if frontmatter_end == -1:
-            return {}, content
-
-        frontmatter_str = content[3:frontmatter_end]
         # テンプレート構文を一時的な値に置き換え
-        frontmatter_str = re.sub(r'\{\{[^}]+\}\}', 'TEMPLATE_VALUE',
-                                 frontmatter_str)
+        frontmatter_str = _TEMPLATE_RE.sub('TEMPLATE_VALUE', frontmatter_str)
 
         try:
-            frontmatter = yaml.safe_load(frontmatter_str)
+            frontmatter = yaml.load(frontmatter_str, Loader=_SafeLoader)
             self.logger.info(f"フロントマター処理成功: {filepath}")
-            return frontmatter, content[frontmatter_end + 3:]
+            return frontmatter, body
         except yaml.YAMLError as e:
             self.logger.warning(
                 f"フロントマターの解析に失敗しましたが、処理を継続します: {filepath} - {e}")
             return {}, content
 
+    def _read_note_if_tagged(self, filepath):
+        """タグを含む可能性があるノートのみ全文を読み込む（含まない場合はNoneを返す）
+
+        ファイルはバイナリのまま一定サイズずつ走査し、タグ文字列が見つからなければ
+        デコードも全文の保持も行わずに終了する。ファイルの末尾に追記されたタグも
+        検出できるよう、先頭部分だけで判定を打ち切ることはしない。
+        """
+        needle = self._tag_needle_bytes
+        overlap = len(needle) - 1
+        with open(filepath, 'rb', buffering=_READ_BUFFER_SIZE) as file:
+            head = file.read(_READ_CHUNK_SIZE)
+            found = False
+            if head.startswith(b'---'):
+                # フロントマターの閉じ区切りが見つかるまで読み進める
+                frontmatter_end = head.find(b'---', 3)
+                while frontmatter_end == -1:
+                    chunk = file.read(_READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    search_start = max(3, len(head) - 2)
+                    head += chunk
+                    frontmatter_end = head.find(b'---', search_start)
+                # フロントマターのタグは'#'なしで記述されるため、区切りの内側だけをタグ名そのもので判定する
+                found = (frontmatter_end != -1
+                         and self._target_tag_bytes in head[3:frontmatter_end])
+            if found or needle in head:
+                # 読み込み済みの先頭部分に残りを連結する
+                data = head + file.read()
+            else:
+                tail = head[-overlap:] if overlap else b''
+                while not found:
+                    chunk = file.read(_READ_CHUNK_SIZE)
+                    if not chunk:
+                        return None
+                    # チャンク境界をまたいだタグも検出できるよう直前の末尾と連結して確認
+                    found = needle in tail + chunk
+                    tail = chunk[-overlap:] if overlap else b''
+                # 途中のチャンクは保持していないため、先頭から一括で読み直す
+                file.seek(0)
+                data = file.read()
+
+        # 一括でデコードし、テキストモードと同様に改行コードを '\n' に統一する
+        content = data.decode('utf-8')
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
+
+    def _iter_entries_in_period(self, start_ts, end_ts):
+        """vault内のMarkdownファイルのうち、検索対象期間内に更新されたものを (DirEntry, stat結果) で返す"""
+        for entry in _iter_md_files(self._vault_path):
+            # DirEntry.stat() はWindowsでは走査時の情報を使うためシステムコールが発生せず、
+            # それ以外では初回呼び出し時に1回だけstatを行い、結果はキャッシュされる
+            try:
+                stat = entry.stat()
+            except FileNotFoundError as e:
+                self.logger.error(f"ファイルが見つかりません: {entry.path} - {e}")
+                continue
+
+            # 指定された期間内かどうか確認（期間外のファイルはスレッドに渡さず、開きもしない）
+            if start_ts <= stat.st_mtime <= end_ts:
+                yield entry, stat
+
+    def _process_entry(self, entry, stat):
+        """検索対象期間内のファイルを処理し、対象ならノートのタプル、対象外ならNoneを返す"""
+        # 前回の実行から更新されていないファイルは解析結果を再利用する
+        filepath = entry.path
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._parse_cache_lock:
+            cached = self._parse_cache.pop(filepath, None)
+            if cached is not None and cached[0] == signature:
+                self._parse_cache[filepath] = cached  # 最近使用したものとして末尾へ移動
+                if cached[1] is not None:
+                    self.logger.info(f"前回の解析結果を再利用: {filepath}")
+                return cached[1]
+
+        note = self._process_one_file(filepath)
+        with self._parse_cache_lock:
+            self._parse_cache[filepath] = (signature, note)
+        return note
+
+    def _process_one_file(self, filepath):
+        """1ファイル分のタグ判定と抽出を行い、対象ならノートのタプル、対象外ならNoneを返す"""
+        # タグを含む可能性のないノートは全文を保持せずにスキップ
+        content = self._read_note_if_tagged(filepath)
+        if content is None:
+            self.logger.info(f"タグ '{self._target_tag}' が見つかりません。スキップ: {filepath}")
+            return None
+        # フロントマターの抽出と処理
+        # フロントマター内にタグ名が無ければタグ判定に影響しないため、YAML解析を省略する
+        frontmatter_str, body = _split_frontmatter(content)
+        if frontmatter_str is not None and self._target_tag not in frontmatter_str:
+            frontmatter, content = {}, body
+        else:
+            frontmatter, content = self._process_frontmatter(
+                content, filepath)
+
+        # タグの確認（フロントマター内）
+        tags = frontmatter.get('tags', [])
+        if tags is None:
+            tags = []
+        elif isinstance(tags, str):
+            tags = [tags]  # 文字列の場合、リストに変換
+
+        # タグの処理
+        if self._target_tag in tags:
+            # フロントマターにタグがある場合、ノート全体を対象とする
+            self.logger.info(f"フロントマターにタグ付きノートを検出: {filepath}")
+            return (filepath, content)
+
+        # 本文中のタグ付き箇条書きブロックを抽出
+        search_tag_regex = self._search_tag_regex
+
+        # まず、コンテンツ全体にタグが含まれているか大まかに確認
+        # （部分文字列が無ければ正規表現は実行しない）
+        if (self._tag_needle not in content
+                or not search_tag_regex.search(content)):
+            self.logger.info(f"コンテンツにタグ '{self._target_tag}' が見つかりません。スキップ: {filepath}")
+            return None
+
+        extracted_tagged_blocks = []
+        content_len = len(content)
+
+        # 行リストを作らず、改行位置を辿りながら行単位で走査する
+        line_start = 0
+        while line_start < content_len:
+            line_end = content.find('\n', line_start)
+            if line_end == -1:
+                line_end = content_len
+            # リストアイテムの開始を検出
+            base_indent_len, is_list_item_start = _scan_list_line(
+                content[line_start:line_end])
+
+            if is_list_item_start:
+                # base_indent_len はリストアイテム開始時のインデント
+                block_end = line_end
+
+                # 同じリストアイテムに属する後続の行を収集
+                next_start = line_end + 1
+                while next_start < content_len:
+                    next_end = content.find('\n', next_start)
+                    if next_end == -1:
+                        next_end = content_len
+                    next_line = content[next_start:next_end]
+                    next_line_leading_space_len, is_next_line_new_list_item = _scan_list_line(next_line)
+
+                    # 現在のブロックを継続する条件:
+                    # 1. 次の行が空行である。
+                    # 2. 次の行が現在のリストアイテムよりも深くインデントされている。
+                    # 3. 次の行が新しいリストアイテムではなく、かつ現在のリストアイテム以上のインデントを持つ (アイテム内の複数行テキストに対応)。
+                    if next_line_leading_space_len == len(next_line): # 条件1: 空行（空白のみの行を含む）
+                        block_end = next_end
+                    elif next_line_leading_space_len > base_indent_len: # 条件2: より深くインデント
+                        block_end = next_end
+                    elif not is_next_line_new_list_item and next_line_leading_space_len >= base_indent_len: # 条件3
+                        block_end = next_end
+                    else:
+                        # 上記条件に合致しない場合、現在のブロックは終了
+                        break
+                    next_start = next_end + 1
+
+                # 現在のブロックが完成（行を結合せず、元のコンテンツから一度だけ切り出す）
+                block_content = content[line_start:block_end]
+                if (self._tag_needle in block_content
+                        and search_tag_regex.search(block_content)):
+                    extracted_tagged_blocks.append(block_content)
+                    self.logger.info(f"タグ付き箇条書きブロックを検出:\n{block_content}")
+
+                line_start = next_start # メインイテレータを次のブロックの開始位置へ移動
+            else:
+                # 行がリストアイテムを開始しない場合は、単に進む
+                line_start = line_end + 1
+
+        if extracted_tagged_blocks:
+            tagged_content = "\n\n".join(extracted_tagged_blocks) # 同じファイル内の複数ブロックは改行2つで結合
+            self.logger.info(f"コンテンツ内のタグ付きブロックを検出: {filepath}")
+            return (filepath, tagged_content)
+        return None
+
     def find_tagged_notes(self):
-        """指定したタグを持つノートファイルを検索"""
+        """指定したタグを持つノートファイルを検索
+
+        戻り値は (ファイルパス, 本文) のリスト
+        本文はフロントマターのタグで対象になった場合はフロントマター除去後の全文、
+        それ以外は抽出したタグ付き箇条書きブロック
+        """
         notes = []
         try:
-            vault_path = self._convert_to_unc_path(self.config['vault_path'])
-            pattern = os.path.join(vault_path, '**/*.md')
-
             # 検索対象期間の取得
             start_datetime, end_datetime = self._get_search_period()
             self.logger.info(f"検索対象期間: {start_datetime} から {end_datetime} まで")
-
-            for filepath in glob.glob(pattern, recursive=True):
-                # ファイルの更新日時を取得
-                try:
-                    last_modified = datetime.fromtimestamp(
-                        os.path.getmtime(filepath))
-                except FileNotFoundError as e:
-                    self.logger.error(f"ファイルが見つかりません: {filepath} - {e}")
-                    continue
-
-                # 指定された期間内かどうか確認
-                if start_datetime <= last_modified <= end_datetime:
-                    with open(filepath, 'r', encoding='utf-8') as file:
-                        content = file.read()
-                        original_content = content  # オリジナルのコンテンツを保持
-                        # フロントマターの抽出と処理
-                        frontmatter, content = self._process_frontmatter(
-                            content, filepath)
-
-                        # タグの確認（フロントマター内）
-                        tags = frontmatter.get('tags', [])
-                        if tags is None:
-                            tags = []
-                        elif isinstance(tags, str):
-                            tags = [tags]  # 文字列の場合、リストに変換
-
-                        # タグの処理
-                        if self.config['target_tag'] in tags:
-                            # フロントマターにタグがある場合、ノート全体を対象とする
-                            notes.append((filepath, original_content))
-                            self.logger.info(f"フロントマターにタグ付きノートを検出: {filepath}")
-                        else:
-                            # 本文中のタグ付き箇条書きブロックを抽出
-                            target_tag_str = self.config['target_tag']
-                            # タグが単独の単語として存在するか確認するための正規表現
-                            search_tag_regex = re.compile(rf'#{target_tag_str}(?:$|\s|[^\w#])')
-
-                            # まず、コンテンツ全体にタグが含まれているか大まかに確認
-                            if not search_tag_regex.search(content):
-                                self.logger.info(f"コンテンツにタグ '{target_tag_str}' が見つかりません。スキップ: {filepath}")
-                            else:
-                                lines = content.splitlines()
-                                extracted_tagged_blocks = []
-                                
-                                i = 0
-                                while i < len(lines):
-                                    line = lines[i]
-                                    match_list_item_start = re.match(r'^(\s*)-\s+', line) # リストアイテムの開始を検出
-
-                                    if match_list_item_start:
-                                        current_block_lines = [line]
-                                        base_indent_len = len(match_list_item_start.group(1)) # リストアイテム開始時のインデント
-                                        
-                                        # 同じリストアイテムに属する後続の行を収集
-                                        j = i + 1
-                                        while j < len(lines):
-                                            next_line = lines[j]
-                                            next_line_leading_space_len = len(re.match(r'^(\s*)', next_line).group(1))
-                                            is_next_line_new_list_item = bool(re.match(r'^\s*-\s+', next_line))
-
-                                            # 現在のブロックを継続する条件:
-                                            # 1. 次の行が空行である。
-                                            # 2. 次の行が現在のリストアイテムよりも深くインデントされている。
-                                            # 3. 次の行が新しいリストアイテムではなく、かつ現在のリストアイテム以上のインデントを持つ (アイテム内の複数行テキストに対応)。
-                                            if not next_line.strip(): # 条件1: 空行
-                                                current_block_lines.append(next_line)
-                                            elif next_line_leading_space_len > base_indent_len: # 条件2: より深くインデント
-                                                current_block_lines.append(next_line)
-                                            elif not is_next_line_new_list_item and next_line_leading_space_len >= base_indent_len: # 条件3
-                                                current_block_lines.append(next_line)
-                                            else:
-                                                # 上記条件に合致しない場合、現在のブロックは終了
-                                                break 
-                                            j += 1
-                                        
-                                        # 現在のブロック (lines[i...j-1]) が完成
-                                        block_content = "\n".join(current_block_lines)
-                                        if search_tag_regex.search(block_content):
-                                            extracted_tagged_blocks.append(block_content)
-                                            self.logger.info(f"タグ付き箇条書きブロックを検出:\n{block_content}")
-                                        
-                                        i = j # メインイテレータを次のブロックの開始位置へ移動
-                                    else:
-                                        # 行がリストアイテムを開始しない場合は、単に進む
-                                        i += 1
-                                
-                                if extracted_tagged_blocks:
-                                    notes.append((filepath, "\n\n".join(extracted_tagged_blocks))) # 同じファイル内の複数ブロックは改行2つで結合
-                                    self.logger.info(f"コンテンツ内のタグ付きブロックを検出: {filepath}")
+            # ファイルごとにdatetimeを生成しないよう、期間をUNIX時刻に変換して比較する
+            start_ts = start_datetime.timestamp()
+            end_ts = end_datetime.timestamp()
+
+            # 期間の判定は走査中のスレッドで行い、期間内のファイルの読み込み・タグ判定のみ
+            # スレッドで並行して処理する（走査と並行して処理を始め、処理待ちの件数は上限までに抑える）
+            max_workers = min(32, (os.cpu_count() or 1) * 4)
+            max_pending = max_workers * 2
+            pending = deque()
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for entry, stat in self._iter_entries_in_period(start_ts, end_ts):
+                    pending.append(executor.submit(self._process_entry, entry, stat))
+                    if len(pending) >= max_pending:
+                        note = pending.popleft().result()
+                        if note is not None:
+                            notes.append(note)
+                while pending:
+                    note = pending.popleft().result()
+                    if note is not None:
+                        notes.append(note)
             return notes
         except Exception as e:
             self.logger.error(f"ノート検索中にエラー: {e}")
@@ -244,62 +505,51 @@ class ObsidianSummary:
 
     def clean_content(self, content):
         """マークダウンコンテンツのクリーニング"""
-        # フロントマターの削除
-        content = re.sub(r'^---\n.*?\n---\n', '', content, flags=re.DOTALL)
+        # フロントマターの削除（正規表現を使わず区切り行の位置から切り出す）
+        if content.startswith('---\n'):
+            frontmatter_end = content.find('\n---\n', 4)
+            if frontmatter_end != -1:
+                content = content[frontmatter_end + 5:]
         # タグの削除
-        content = re.sub(r'#\w+', '', content)
-        return content.strip()
+        return _TAG_RE.sub('', content).strip()
 
-    def summarize_with_ai(self, notes):
-        """OpenAI APIを使用して複数のノートをまとめて要約"""
-        combined_content = []
-
-        for filepath, content in notes:
+    def _iter_note_sections(self, notes):
+        """要約対象ノートの (タイトル, 要約対象テキスト) を順に返す"""
+        for filepath, body in notes:
             filename = os.path.basename(filepath)
 
-            # フロントマターの処理
-            frontmatter, _ = self._process_frontmatter(content, filepath)
-
-            # タグの確認（フロントマター内）
-            tags = frontmatter.get('tags', [])
-            if tags is None:
-                tags = []
-            elif isinstance(tags, str):
-                tags = [tags]
-
             # ファイル名から拡張子を除去してタイトルとして使用
             title = os.path.splitext(filename)[0]
 
-            # フロントマターと本文から対象箇条書きまたは全体内容を取得
-            # コンテンツ本文（フロントマター除去後）を使用
-            body_content = content
-
-            if self.config['target_tag'] in tags:
-                # フロントマターにタグがある場合は全文を要約
-                target_raw = body_content
-            else:
-                # 本文中のタグ付き箇条書きを抽出
-                target_tag_with_hash = '#' + self.config['target_tag']
-                target_raw = body_content
-
-            # タグ行を削除して余分な空白をトリム
-            target_content = re.sub(r'#\w+', '', target_raw).strip()
+            # body はフロントマタータグ付きなら本文全体、それ以外はタグ付きブロックの結合で、
+            # いずれもフロントマターは除去済みのためタグのみ削除する
+            target_content = _TAG_RE.sub('', body).strip()
 
             # タグ付きコンテンツがない場合はスキップ
             if not target_content:
                 continue
-            # タイトルを追加
-            combined_content.append(f"【{title}】\n{target_content}")
+            yield title, target_content
+
+    def summarize_with_ai(self, notes):
+        """OpenAI APIを使用して複数のノートをまとめて要約"""
+        # 全てのノートの内容をタイトル付きで結合（ノートごとの中間文字列を作らずバッファへ直接書き込む）
+        buffer = io.StringIO()
+        separator = ''
+        for title, target_content in self._iter_note_sections(notes):
+            buffer.write(separator)
+            buffer.write('【')
+            buffer.write(title)
+            buffer.write('】\n')
+            buffer.write(target_content)
+            separator = '\n\n---\n\n'
+        all_content = buffer.getvalue()
 
         # コンテンツが空の場合は要約をスキップ
-        if not combined_content:
+        if not all_content:
             message = "要約対象のノートが見つかりませんでした。AI要約をスキップします。"
             self.logger.info(message)
             return message
 
-        # 全てのノートの内容を結合
-        all_content = "\n\n---\n\n".join(combined_content)
-
         # AIへ送信するノート内容をログに記録
         self.logger.info("=== AIへ送信するノート内容 ===")
         self.logger.info(all_content)
@@ -317,7 +567,6 @@ class ObsidianSummary:
         self.logger.info(system_prompt)
 
         headers = {
-            "Content-Type": "application/json",
             "Authorization": f"Bearer {self.config['openai']['api_key']}"
         }
 
@@ -342,28 +591,126 @@ class ObsidianSummary:
             "max_completion_tokens":
             self.config['openai']['max_tokens'],
             "store":
+            True,
+            "stream":
             True
         }
 
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=data)
-            response.raise_for_status()
-            summary = response.json()['choices'][0]['message']['content']
+            if self._http is None:
+                self._http = self._create_http_session()
+            with self._http.post(
+                    "https://api.openai.com/v1/chat/completions",
+                    headers=headers,
+                    json=data,
+                    stream=True,
+                    timeout=(5, 300)) as response:
+                response.raise_for_status()
+                summary = self._read_streamed_completion(response)
             return summary
         except Exception as e:
             self.logger.error(f"AI要約エラー: {e}")
             return f"要約エラー: {str(e)[:100]}..."
 
+    def _read_streamed_completion(self, response):
+        """ストリーミング応答（Server-Sent Events）から要約本文を組み立てる"""
+        parts = []
+        finished = False
+        for line in response.iter_lines():
+            if not line.startswith(b'data:'):
+                continue
+            payload = line[len(b'data:'):].strip()
+            if payload == b'[DONE]':
+                finished = True
+                break
+
+            event = json.loads(payload)
+            # ストリームの途中でエラーが通知された場合は要約失敗として扱う
+            if 'error' in event:
+                error = event['error']
+                message = error.get('message') if isinstance(error, dict) else error
+                raise RuntimeError(f"ストリーミング応答でエラーを受信: {message}")
+
+            choices = event.get('choices') or []
+            if not choices:
+                continue
+            content = (choices[0].get('delta') or {}).get('content')
+            if content:
+                parts.append(content)
+                if len(parts) % _STREAM_LOG_INTERVAL == 0:
+                    self.logger.info(f"要約を受信中: {len(parts)}チャンク")
+            if choices[0].get('finish_reason'):
+                finished = True
+
+        # 完了通知を受け取る前に接続が切れた場合は、途中までの要約を返さない
+        if not finished:
+            raise RuntimeError(f"ストリーミング応答が途中で終了しました（受信済み: {len(parts)}チャンク）")
+
+        self.logger.info(f"要約の受信完了: {len(parts)}チャンク")
+        return ''.join(parts)
+
     def _validate_email(self, email):
         """メールアドレスの簡易バリデーション"""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        # '@' を含まない明らかな不正値は正規表現を使わずに除外
+        return '@' in email and _EMAIL_RE.fullmatch(email) is not None
+
+    def _open_smtp(self):
+        """SMTPサーバーに接続・認証し、接続済みのサーバーを返す"""
+        # メール送信を行う場合のみ必要なため、使用時に読み込む
+        import smtplib
+
+        # use_ssl が有効な場合は接続時からTLSを使用し、STARTTLSの往復を省略
+        use_ssl = self.config['email'].get('use_ssl', False)
+        smtp_class = smtplib.SMTP_SSL if use_ssl else smtplib.SMTP
+        server = smtp_class(self.config['email']['smtp_server'],
+                            self.config['email']['smtp_port'])
+        try:
+            if not use_ssl:
+                server.starttls()
+            server.login(self.config['email']['from'],
+                         self.config['email']['password'])
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _is_smtp_alive(self, server):
+        """SMTP接続がまだ利用可能か確認"""
+        import smtplib
+
+        try:
+            return server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
 
-    def send_email(self, notes_summary):
-        """複数の宛先にメール送信"""
+    def _take_preopened_smtp(self, future):
+        """事前接続したSMTPサーバーを取得（接続レベルの失敗時は None を返し、送信時に再接続させる）"""
+        import smtplib
+
+        try:
+            return future.result()
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError) as e:
+            self.logger.warning(f"SMTPサーバーへの事前接続に失敗したため、送信時に再接続します: {e}")
+            return None
+        except smtplib.SMTPException:
+            # 認証エラー等は再試行しても解決せず、失敗した認証を重ねるとアカウントがロックされる恐れがあるため中断する
+            raise
+        except OSError as e:
+            self.logger.warning(f"SMTPサーバーへの事前接続に失敗したため、送信時に再接続します: {e}")
+            return None
+
+    def _get_to_addresses(self):
+        """設定から送信先アドレスのリストを取得"""
+        to_addresses = self.config['email'].get('to', [])
+        if isinstance(to_addresses, str):
+            # カンマ区切りの文字列の場合、リストに変換
+            return [addr.strip() for addr in to_addresses.split(',')]
+        if not isinstance(to_addresses, list):
+            return [str(to_addresses)]
+        return to_addresses
+
+    def send_email(self, notes_summary, smtp_future=None):
+        """複数の宛先にメール送信（smtp_future に事前接続の処理を渡した場合はその接続を使用）"""
         # 要約内容を常にログに記録
         self.logger.info("=== 要約内容 ===")
         self.logger.info(notes_summary)
@@ -372,17 +719,9 @@ class ObsidianSummary:
             self.logger.info("メール送信がスキップされました（設定で無効化されています）")
             return
 
-        # 送信先アドレスのリストを取得
-        to_addresses = self.config['email'].get('to', [])
-        if isinstance(to_addresses, str):
-            # カンマ区切りの文字列の場合、リストに変換
-            to_addresses = [addr.strip() for addr in to_addresses.split(',')]
-        elif not isinstance(to_addresses, list):
-            to_addresses = [str(to_addresses)]
-
         # 無効なメールアドレスをフィルタリング
         valid_addresses = []
-        for addr in to_addresses:
+        for addr in self._get_to_addresses():
             if self._validate_email(addr):
                 valid_addresses.append(addr)
             else:
@@ -393,7 +732,10 @@ class ObsidianSummary:
             self.logger.error(error_msg)
             raise ValueError(error_msg)
 
-        # メール送信の準備
+        # メール送信の準備（メール関連モジュールは送信時のみ読み込む）
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+
         msg = MIMEMultipart()
         from_addr = self.config['email']['from']
         msg['From'] = from_addr
@@ -418,21 +760,27 @@ class ObsidianSummary:
 
         # SMTP接続と送信
         try:
-            server = smtplib.SMTP(self.config['email']['smtp_server'],
-                                  self.config['email']['smtp_port'])
-            server.starttls()
-            server.login(from_addr, self.config['email']['password'])
-
-            try:
-                server.send_message(msg)
-                self.logger.info(f"メール送信成功 - 送信先数: {len(valid_addresses)}")
-                for addr in valid_addresses:
-                    self.logger.info(f"送信先: {addr}")
-            except Exception as e:
-                self.logger.error(f"メール送信エラー: {e}")
-                raise
-
-            server.quit()
+            # 事前接続で認証エラー等が発生していた場合は、ここで接続エラーとして扱う
+            server = None
+            if smtp_future is not None:
+                server = self._take_preopened_smtp(smtp_future)
+            if server is not None and not self._is_smtp_alive(server):
+                # AI要約を待つ間にサーバー側で切断された場合は接続し直す
+                self.logger.info("事前に確立したSMTP接続が切断されていたため再接続します")
+                server.close()
+                server = None
+            if server is None:
+                server = self._open_smtp()
+
+            with server:
+                try:
+                    server.send_message(msg)
+                    self.logger.info(f"メール送信成功 - 送信先数: {len(valid_addresses)}")
+                    for addr in valid_addresses:
+                        self.logger.info(f"送信先: {addr}")
+                except Exception as e:
+                    self.logger.error(f"メール送信エラー: {e}")
+                    raise
 
         except Exception as e:
             self.logger.error(f"SMTP接続/認証エラー: {e}")
@@ -442,24 +790,40 @@ class ObsidianSummary:
         """メインタスク実行"""
         try:
             self.logger.info("Obsidian要約タスク開始")
+            # 実行のたびに検索対象期間を計算し直す
+            self._search_period = None
             tagged_notes = self.find_tagged_notes()
+            self._save_parse_cache()
 
             if not tagged_notes:
                 message = "要約対象のノートが見つかりませんでした。AI要約をスキップします。"
                 self.logger.info(message)
                 return  # 要約対象が見つからない場合はここで終了
 
-            # skip_summaryオプションの確認
-            if self.config['openai'].get('skip_summary', False):
-                message = f"AI要約がスキップされました（設定でスキップが有効）\n\n対象ノート数: {len(tagged_notes)}件"
-                self.logger.info("AI要約スキップ（設定で無効化されています）")
-                all_summaries = message
-            else:
-                self.logger.info(f"ノート要約開始: {len(tagged_notes)}件のノートを処理")
-                all_summaries = self.summarize_with_ai(tagged_notes)
-
-            # メール送信の実行（無効の場合は内部でスキップ）
-            self.send_email(all_summaries)
+            smtp_future = None
+            try:
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    # skip_summaryオプションの確認
+                    if self.config['openai'].get('skip_summary', False):
+                        message = f"AI要約がスキップされました（設定でスキップが有効）\n\n対象ノート数: {len(tagged_notes)}件"
+                        self.logger.info("AI要約スキップ（設定で無効化されています）")
+                        all_summaries = message
+                    else:
+                        # 有効な送信先が無い場合は送信時にエラーとなるため、事前の接続・認証は行わない
+                        if (self.config['email'].get('enabled', True)
+                                and any(self._validate_email(addr) for addr in self._get_to_addresses())):
+                            # AI要約の応答を待つ間に、SMTPサーバーへの接続・認証を並行して済ませておく
+                            smtp_future = executor.submit(self._open_smtp)
+                        self.logger.info(f"ノート要約開始: {len(tagged_notes)}件のノートを処理")
+                        all_summaries = self.summarize_with_ai(tagged_notes)
+
+                # メール送信の実行（無効の場合は内部でスキップ）
+                self.send_email(all_summaries, smtp_future=smtp_future)
+            finally:
+                # 要約・送信中に例外が発生した場合も、事前に確立したSMTP接続は必ず閉じる
+                # （with を抜けた時点で事前接続の処理は完了している）
+                if smtp_future is not None and smtp_future.exception() is None:
+                    smtp_future.result().close()
 
             # メール送信の状態に応じたログ出力
             if self.config['email'].get('enabled', True):
@@ -477,8 +841,7 @@ def main():
     try:
         # 設定を読み込んでロギングを初期化
         config_path = 'config.yaml'
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+        config = _load_config_file(config_path)
         setup_logging(config)  # ロギング設定を先に初期化
 
         # ObsidianSummaryを初期化して実行